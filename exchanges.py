@@ -1,46 +1,135 @@
 import ccxt
+import json
 import os
+import threading
+import time
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Any
 
+# Upper bound on concurrent requests, exchange HTTP pools are sized to match
+MAX_WORKERS = 32
+
+# Upper bound on in-flight requests to any single exchange from concurrent fetches
+MAX_REQUESTS_PER_EXCHANGE = 4
+
+# JSON market snapshots, shared across runs and processes to skip load_markets.
+# Anchored to this module so the cache doesn't depend on the working directory
+MARKETS_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".ccxt_cache"
+)
+MARKETS_CACHE_TTL = 24 * 60 * 60
+
+
+@lru_cache(maxsize=None)
+def get_exchange(exchange_id: str) -> Any:
+    """
+    Returns the ccxt client for an exchange, constructed once per process so
+    repeated callers share the same client and its loaded markets.
+
+    Credentials are read from the {EXCHANGE_ID}_API_KEY, {EXCHANGE_ID}_SECRET_KEY
+    and {EXCHANGE_ID}_API_PASSWORD environment variables, whichever are set.
+    """
+    config = {}
+    for key, env_suffix in (
+        ("apiKey", "API_KEY"),
+        ("secret", "SECRET_KEY"),
+        ("password", "API_PASSWORD"),
+    ):
+        value = os.environ.get(f"{exchange_id.upper()}_{env_suffix}")
+        if value:
+            config[key] = value
+
+    exchange = getattr(ccxt, exchange_id)(config)
+    # ccxt keeps one requests.Session per exchange; size its pool so concurrent
+    # fetches reuse warm keep-alive connections instead of dropping them and
+    # paying a new TLS handshake
+    exchange.session.mount("https://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
+    _serialize_throttle(exchange)
+    return exchange
+
+
+@lru_cache(maxsize=None)
+def get_request_slots(exchange_id: str) -> threading.BoundedSemaphore:
+    """
+    Returns the semaphore bounding in-flight requests to an exchange, shared
+    process-wide like the client from get_exchange.
+    """
+    return threading.BoundedSemaphore(MAX_REQUESTS_PER_EXCHANGE)
+
+
+def _serialize_throttle(exchange: Any) -> None:
+    # ccxt's sync throttle reads and writes lastRestRequestTimestamp without a
+    # lock, so threads sharing a client all sleep the same delay and then fire
+    # together. Holding a per-exchange lock while throttling, and stamping the
+    # request time before releasing it, spaces request starts by the rate limit.
+    lock = threading.Lock()
+    throttle = exchange.throttle
+
+    def locked_throttle(cost=None):
+        with lock:
+            throttle(cost)
+            exchange.lastRestRequestTimestamp = exchange.milliseconds()
+
+    exchange.throttle = locked_throttle
+
+
 exchanges = {
-    "kucoin": ccxt.kucoin(
-        {
-            "apiKey": os.environ.get(f"KUCOIN_API_KEY"),
-            "secret": os.environ.get(f"KUCOIN_SECRET_KEY"),
-            "password": os.environ.get(f"KUCOIN_API_PASSWORD"),
-        }
-    ),
-    "phemex": ccxt.phemex(
-        {
-            "apiKey": os.environ.get(f"PHEMEX_API_KEY"),
-            "secret": os.environ.get(f"PHEMEX_SECRET_KEY"),
-        }
-    ),
+    "kucoin": get_exchange("kucoin"),
+    "phemex": get_exchange("phemex"),
 }
 
 
 def initialize_exchanges(exchange_ids: List[str]) -> Dict[str, Any]:
+    """
+    Returns the clients for the given exchange IDs, skipping exchanges that fail to initialize.
 
-    raise NotImplementedError
-    # Fails on Kucoin because password is required
-    # May initializes exchanges that only have public methods availabe and therefore can have unexpected behavior
+    Exchanges without credentials in the environment only have public methods available.
+    """
 
     exchanges = {}
 
     for exchange_id in exchange_ids:
-
-        api_key = os.environ.get(f"{exchange_id.upper()}_API_KEY")
-        secret_key = os.environ.get(f"{exchange_id.upper()}_SECRET_KEY")
-
         try:
-            exchange = (
-                getattr(ccxt, exchange_id)({"apiKey": api_key, "secret": secret_key})
-                if api_key and secret_key
-                else getattr(ccxt, exchange_id)()
-            )
-            exchanges[exchange_id] = exchange
-
+            exchanges[exchange_id] = get_exchange(exchange_id)
         except Exception as e:
             print(f"Couldn't initialize exchange {exchange_id}: {e}")
 
     return exchanges
+
+
+def cached_load_markets(exchange: Any, path: str = MARKETS_CACHE_DIR) -> Dict[str, Any]:
+    """
+    Loads the markets of an exchange, reusing a JSON snapshot from disk while it is
+    younger than MARKETS_CACHE_TTL seconds and refreshing it from the exchange otherwise.
+
+    Only one snapshot per exchange is kept, so the cache stays bounded in size.
+    """
+    if exchange.markets:
+        return exchange.markets
+
+    cache_file = os.path.join(path, f"{exchange.id}.json")
+    try:
+        if time.time() - os.path.getmtime(cache_file) < MARKETS_CACHE_TTL:
+            with open(cache_file) as f:
+                snapshot = json.load(f)
+            exchange.set_markets(snapshot["markets"], snapshot["currencies"])
+            return exchange.markets
+    except Exception:
+        # Missing, stale or unreadable snapshot, fall back to the exchange
+        pass
+
+    markets = exchange.load_markets()
+    try:
+        os.makedirs(path, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial snapshot
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(
+                {"markets": exchange.markets, "currencies": exchange.currencies}, f
+            )
+        os.replace(tmp_file, cache_file)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Couldn't cache markets for exchange {exchange.id}: {e}")
+
+    return markets
@@ -1,11 +1,18 @@
 import os, time
+import asyncio
 from itertools import permutations, product, combinations
 import ccxt
 import traceback
-from typing import List, Dict, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Union, Optional, Any
 import tokens
 import exchanges
 
+# Seconds to wait before re-watching an order book after a network error, doubled on
+# each consecutive error up to WATCH_RETRY_MAX_DELAY
+WATCH_RETRY_DELAY = 1.0
+WATCH_RETRY_MAX_DELAY = 30.0
+
 
 class OrderBooks:
 
@@ -21,10 +28,15 @@ class OrderBooks:
         # define attributes here for mutability
         self.symbols = tokens.symbols
         self.exchanges = exchanges.exchanges
+        # latest streamed order book per (exchange_id, symbol), see stream_orderbooks
+        self.latest: Dict[Tuple[str, str], List] = {}
 
     def fetch_orderbooks(self, depth: int = 100) -> List[List]:
         """
         Fetches the order books for each symbol on each exchange.
+        Each symbol is fetched once, in the direction the exchange lists it.
+        The requests are network-bound, so they are issued concurrently from a thread pool,
+        with at most MAX_REQUESTS_PER_EXCHANGE in flight per exchange.
 
         Args:
         - depth (int): The number of price levels to fetch from the order book (default=100).
@@ -33,32 +45,139 @@ class OrderBooks:
         A list of lists, where each sub-list contains:
         - symbol (str): The symbol for which the order book was fetched.
         - exchange_id (str): The exchange ID from which the order book was fetched.
-        - timestamp (int): The current timestamp in milliseconds.
+        - timestamp (int): The exchange's timestamp of the order book in milliseconds, or the time it was received when the exchange doesn't provide one.
         - order_book (dict): A dictionary containing two lists: "bids" and "asks". Each list contains a list of lists, where the inner lists represent a price level and its corresponding quantity. The prices and quantities are in floating point format.
         """
-        orderbooks = []
-        for symbol in self.symbols:
-            for exchange_id, exchange in self.exchanges.items():
-                try:
-                    orderbook = exchange.fetch_order_book(symbol, depth)
-                    timestamp = int(time.time() * 1000)
-                    bids = [
-                        [float(price), float(amount)]
-                        for price, amount in orderbook["bids"]
-                    ]
-                    asks = [
-                        [float(price), float(amount)]
-                        for price, amount in orderbook["asks"]
-                    ]
-                    orderbooks.append(
-                        [symbol, exchange_id, timestamp, {"bids": bids, "asks": asks}]
-                    )
-                except Exception as e:
-                    print(f"Error fetching order book: {e}")
-                    continue
+        if not self.symbols or not self.exchanges:
+            return []
+
+        with ThreadPoolExecutor(max_workers=exchanges.MAX_WORKERS) as executor:
+            # Load markets before fanning out, otherwise every concurrent fetch on
+            # a fresh exchange would trigger its own load_markets call
+            list(executor.map(self._load_markets, self.exchanges))
+            pairs = self._listed_pairs()
+            results = executor.map(
+                lambda pair: self._fetch_orderbook(*pair, depth), pairs
+            )
+            orderbooks = [orderbook for orderbook in results if orderbook]
 
         return orderbooks
 
+    def _listed_pairs(self) -> List[Tuple[str, str]]:
+        """
+        Returns the (symbol, exchange_id) pairs to fetch, with each symbol in the direction the
+        exchange lists it, so a pair and its reverse cost a single request and symbols the
+        exchange doesn't list in either direction cost none.
+        """
+        pairs = {}
+        for symbol, exchange_id in product(self.symbols, self.exchanges):
+            markets = self.exchanges[exchange_id].markets or {}
+            base, quote = symbol.split("/")
+            for listed_symbol in (symbol, f"{quote}/{base}"):
+                if listed_symbol in markets:
+                    pairs[(listed_symbol, exchange_id)] = None
+                    break
+        return list(pairs)
+
+    def _load_markets(self, exchange_id: str) -> None:
+        try:
+            exchanges.cached_load_markets(self.exchanges[exchange_id])
+        except Exception as e:
+            print(f"Couldn't load markets for exchange {exchange_id}: {e}")
+
+    def _fetch_orderbook(
+        self, symbol: str, exchange_id: str, depth: int
+    ) -> Optional[List]:
+        try:
+            # Cap in-flight requests per exchange, the shared client's throttle
+            # only spaces out request starts
+            with exchanges.get_request_slots(exchange_id):
+                orderbook = self.exchanges[exchange_id].fetch_order_book(
+                    symbol, depth
+                )
+            return self._format_orderbook(symbol, exchange_id, orderbook)
+        except Exception as e:
+            print(f"Error fetching order book: {e}")
+            return None
+
+    def _format_orderbook(
+        self, symbol: str, exchange_id: str, orderbook: Dict[str, Any]
+    ) -> List:
+        timestamp = orderbook.get("timestamp") or int(time.time() * 1000)
+        # ccxt's unified order books already hold floats, only trim any
+        # exchange-specific extra fields so levels are [price, amount]
+        bids = [level[:2] for level in orderbook["bids"]]
+        asks = [level[:2] for level in orderbook["asks"]]
+        return [symbol, exchange_id, timestamp, {"bids": bids, "asks": asks}]
+
+    async def stream_orderbooks(self, depth: int = 100) -> None:
+        """
+        Streams the order books for each symbol on each exchange over websockets, instead of
+        polling REST snapshots, and keeps the latest one per (exchange_id, symbol) in self.latest.
+        Like fetch_orderbooks, each symbol is watched once, in the direction the exchange lists it.
+
+        Runs until cancelled, consumers read self.latest whose values have the same format
+        as the sub-lists returned by fetch_orderbooks.
+
+        Args:
+        - depth (int): The number of price levels to watch in the order book (default=100).
+        """
+        # ccxt.pro is only needed for streaming and is slow to import
+        import ccxt.pro
+
+        # Markets decide the direction each symbol is listed in, see _listed_pairs
+        await asyncio.gather(
+            *(
+                asyncio.to_thread(self._load_markets, exchange_id)
+                for exchange_id in self.exchanges
+            )
+        )
+
+        clients = {}
+        for exchange_id in self.exchanges:
+            try:
+                clients[exchange_id] = getattr(ccxt.pro, exchange_id)()
+            except Exception as e:
+                print(f"Couldn't initialize exchange {exchange_id}: {e}")
+
+        try:
+            # Subscribe to everything at once, starting the watchers one by one
+            # staggers the first snapshots across exchanges
+            await asyncio.gather(
+                *(
+                    self._watch_orderbook(
+                        symbol, exchange_id, clients[exchange_id], depth
+                    )
+                    for symbol, exchange_id in self._listed_pairs()
+                    if exchange_id in clients
+                )
+            )
+        finally:
+            await asyncio.gather(*(client.close() for client in clients.values()))
+
+    async def _watch_orderbook(
+        self, symbol: str, exchange_id: str, exchange: Any, depth: int
+    ) -> None:
+        retry_delay = WATCH_RETRY_DELAY
+        while True:
+            try:
+                orderbook = await exchange.watch_order_book(symbol, depth)
+            except ccxt.NetworkError as e:
+                # ccxt.pro reconnects on the next watch call, back off so an outage
+                # doesn't turn into a reconnect loop
+                print(f"Error watching order book: {e}")
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, WATCH_RETRY_MAX_DELAY)
+                continue
+            except Exception as e:
+                print(f"Error watching order book: {e}")
+                return
+
+            retry_delay = WATCH_RETRY_DELAY
+            self.latest[(exchange_id, symbol)] = self._format_orderbook(
+                symbol, exchange_id, orderbook
+            )
+
 
 if __name__ == "__main__":
 
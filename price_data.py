@@ -1,8 +1,16 @@
-import os, time
-from itertools import permutations, product, combinations
-import ccxt
+import time
+from itertools import product, combinations
 import traceback
-from typing import List, Dict, Tuple, Union
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Union, Optional, FrozenSet, Iterator
+import exchanges
+
+# Seconds a ticker snapshot is reused by iterations started shortly after it was taken
+TICKER_SNAPSHOT_TTL = 1.0
+
+# Seconds a fetched order book is reused by fetch_orderbooks calls at the same depth
+ORDERBOOK_CACHE_TTL = 0.25
 
 
 class PriceData:
@@ -23,37 +31,41 @@ class PriceData:
         ```
         """
         self.symbols = symbols
-        self.exchanges = {}
-        self.exchange_symbols = list(product(exchange_ids, symbols))
         self.current_index = 0
 
-        # Initialize the exchange objects
-        for exchange_id in exchange_ids:
-            api_key = os.environ.get(f"{exchange_id.upper()}_API_KEY")
-            secret_key = os.environ.get(f"{exchange_id.upper()}_SECRET_KEY")
+        # Exchange clients are shared process-wide, see exchanges.get_exchange
+        self.exchanges = exchanges.initialize_exchanges(exchange_ids)
 
-            try:
-                exchange = (
-                    getattr(ccxt, exchange_id)(
-                        {"apiKey": api_key, "secret": secret_key}
-                    )
-                    if api_key and secret_key
-                    else getattr(ccxt, exchange_id)()
-                )
-                self.exchanges[exchange_id] = exchange
-            except Exception as e:
-                print(f"Couldn't initialize exchange {exchange_id}: {e}")
+        # Load markets once per exchange so pairs an exchange doesn't list are
+        # skipped with a set lookup instead of a failing network round-trip
+        self._supported: Dict[str, FrozenSet[str]] = {}
+        if self.exchanges:
+            with ThreadPoolExecutor(max_workers=len(self.exchanges)) as executor:
+                list(executor.map(self._load_markets, self.exchanges))
+
+        self.exchange_symbols = [
+            (exchange_id, symbol)
+            for exchange_id, symbol in product(exchange_ids, symbols)
+            if symbol in self._supported.get(exchange_id, ())
+        ]
+        self._ticker_snapshot: Optional[Dict[str, Dict[str, Dict]]] = None
+        self._ticker_snapshot_ts = 0.0
+        self._reversed_pairs: Dict[Tuple[str, str], bool] = {}
+        # (symbol, exchange_id, depth) -> (time.monotonic() when fetched, order book)
+        self._orderbook_cache: Dict[Tuple[str, str, int], Tuple[float, List]] = {}
 
     def __iter__(self) -> "PriceData":
         """
-        Initialize the iterator object with the current index.
+        Initialize the iterator object with the current index and a ticker snapshot,
+        reusing the previous snapshot if it is younger than TICKER_SNAPSHOT_TTL.
         """
         self.current_index = 0
+        self._refresh_ticker_snapshot()
         return self
 
     def __next__(self) -> Dict[str, str]:
         """
-        Fetch the ticker from the current index and update the index for the next iteration.
+        Read the ticker at the current index from the snapshot and update the index for the next iteration.
 
         Returns:
         A dictionary containing the current ticker's exchange, symbol, and price.
@@ -68,8 +80,11 @@ class PriceData:
             if not exchange:
                 raise ValueError(f"Exchange not initialized: {exchange_id}")
 
-            ticker = exchange.fetch_ticker(symbol)
-            price = ticker["last"]
+            if self._ticker_snapshot is None:
+                self._refresh_ticker_snapshot()
+
+            ticker = self._ticker_snapshot.get(exchange_id, {}).get(symbol)
+            price = ticker["last"] if ticker else None
         except (StopIteration, ValueError) as e:
             raise e
         except Exception as e:
@@ -82,9 +97,67 @@ class PriceData:
 
         return {"exchange": exchange_id, "symbol": symbol, "price": price}
 
+    def _refresh_ticker_snapshot(self) -> None:
+        # The snapshot is never refreshed mid-iteration, so every price in one
+        # pass comes from the same point in time
+        if (
+            self._ticker_snapshot is None
+            or time.monotonic() - self._ticker_snapshot_ts >= TICKER_SNAPSHOT_TTL
+        ):
+            self._ticker_snapshot = self._snapshot_tickers()
+            self._ticker_snapshot_ts = time.monotonic()
+
+    def _snapshot_tickers(self) -> Dict[str, Dict[str, Dict]]:
+        """
+        Fetches the tickers for every supported (exchange, symbol) pair, using a single
+        fetch_tickers request per exchange where the exchange supports it.
+
+        Returns:
+        A dictionary mapping each exchange ID to a dictionary of tickers keyed by symbol.
+        """
+        symbols_by_exchange = {exchange_id: [] for exchange_id in self.exchanges}
+        for exchange_id, symbol in self.exchange_symbols:
+            symbols_by_exchange[exchange_id].append(symbol)
+        if not symbols_by_exchange:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=len(symbols_by_exchange)) as executor:
+            tickers = executor.map(
+                lambda item: self._fetch_tickers(*item), symbols_by_exchange.items()
+            )
+            return dict(zip(symbols_by_exchange, tickers))
+
+    def _fetch_tickers(self, exchange_id: str, symbols: List[str]) -> Dict[str, Dict]:
+        exchange = self.exchanges[exchange_id]
+        if not symbols:
+            return {}
+
+        if exchange.has.get("fetchTickers"):
+            try:
+                return exchange.fetch_tickers(symbols)
+            except Exception as e:
+                print(
+                    f"An error occurred while fetching tickers from {exchange_id}: {e}"
+                )
+                return {}
+
+        tickers = {}
+        for symbol in symbols:
+            try:
+                tickers[symbol] = exchange.fetch_ticker(symbol)
+            except Exception as e:
+                print(
+                    f"An error occurred while fetching ticker from {exchange_id} for {symbol}: {e}"
+                )
+        return tickers
+
     def fetch_orderbooks(self, depth: int = 100) -> List[List]:
         """
         Fetches the order books for each symbol on each exchange in the instance's list of exchange IDs.
+        The requests are network-bound, so they are issued concurrently from a thread pool
+        with at most MAX_REQUESTS_PER_EXCHANGE in flight per exchange, and order books
+        fetched less than ORDERBOOK_CACHE_TTL seconds ago are reused. Callers get their own
+        copies of the rows, so mutating them doesn't affect the cache.
 
         Args:
         - depth (int): The number of price levels to fetch from the order book (default=100).
@@ -93,29 +166,109 @@ class PriceData:
         A list of lists, where each sub-list contains:
         - symbol (str): The symbol for which the order book was fetched.
         - exchange_id (str): The exchange ID from which the order book was fetched.
-        - timestamp (int): The current timestamp in milliseconds.
+        - timestamp (int): The exchange's timestamp of the order book in milliseconds, or the time it was received when the exchange doesn't provide one.
         - order_book (dict): A dictionary containing two lists: "bids" and "asks". Each list contains a list of lists, where the inner lists represent a price level and its corresponding quantity. The prices and quantities are in floating point format.
         """
-        orderbooks = []
-        for symbol in self.symbols:
-            for exchange_id, exchange in self.exchanges.items():
-                try:
-                    orderbook = exchange.fetch_order_book(symbol, depth)
-                    timestamp = int(time.time() * 1000)
-                    bids = [
-                        [float(price), float(amount)]
-                        for price, amount in orderbook["bids"]
-                    ]
-                    asks = [
-                        [float(price), float(amount)]
-                        for price, amount in orderbook["asks"]
-                    ]
-                    orderbooks.append(
-                        [symbol, exchange_id, timestamp, {"bids": bids, "asks": asks}]
-                    )
-                except Exception as e:
-                    print(f"Error fetching order book: {e}")
+        # Order books fetched within ORDERBOOK_CACHE_TTL are reused. Of the rest,
+        # exchanges that support fetch_order_books get a single batched request
+        # and the others get one request per symbol
+        now = time.monotonic()
+        fetched = {}
+        batches = []
+        for exchange_id, exchange in self.exchanges.items():
+            symbols = []
+            for symbol in self.symbols:
+                if symbol not in self._supported[exchange_id]:
                     continue
+                cached = self._orderbook_cache.get((symbol, exchange_id, depth))
+                if cached and now - cached[0] < ORDERBOOK_CACHE_TTL:
+                    fetched[(symbol, exchange_id)] = cached[1]
+                else:
+                    symbols.append(symbol)
+            if not symbols:
+                continue
+            if exchange.has.get("fetchOrderBooks") is True:
+                batches.append((exchange_id, symbols))
+            else:
+                batches.extend((exchange_id, [symbol]) for symbol in symbols)
+
+        if batches:
+            with ThreadPoolExecutor(
+                max_workers=min(exchanges.MAX_WORKERS, len(batches))
+            ) as executor:
+                results = executor.map(
+                    lambda batch: self._fetch_orderbooks(*batch, depth), batches
+                )
+                new_orderbooks = [
+                    orderbook for orderbooks in results for orderbook in orderbooks
+                ]
+
+            fetched_at = time.monotonic()
+            for orderbook in new_orderbooks:
+                symbol, exchange_id = orderbook[0], orderbook[1]
+                fetched[(symbol, exchange_id)] = orderbook
+                self._orderbook_cache[(symbol, exchange_id, depth)] = (
+                    fetched_at,
+                    orderbook,
+                )
+
+        return [
+            self._copy_orderbook(fetched[pair])
+            for pair in product(self.symbols, self.exchanges)
+            if pair in fetched
+        ]
+
+    @staticmethod
+    def _copy_orderbook(orderbook: List) -> List:
+        symbol, exchange_id, timestamp, book = orderbook
+        return [
+            symbol,
+            exchange_id,
+            timestamp,
+            {side: [level[:] for level in levels] for side, levels in book.items()},
+        ]
+
+    def _load_markets(self, exchange_id: str) -> None:
+        try:
+            markets = exchanges.cached_load_markets(self.exchanges[exchange_id])
+            self._supported[exchange_id] = frozenset(markets)
+        except Exception as e:
+            print(f"Couldn't load markets for exchange {exchange_id}: {e}")
+            self._supported[exchange_id] = frozenset()
+
+    def _fetch_orderbooks(
+        self, exchange_id: str, symbols: List[str], depth: int
+    ) -> List[List]:
+        exchange = self.exchanges[exchange_id]
+        try:
+            # Cap in-flight requests per exchange, the shared client's throttle
+            # only spaces out request starts
+            with exchanges.get_request_slots(exchange_id):
+                if len(symbols) == 1:
+                    raw_orderbooks = {
+                        symbols[0]: exchange.fetch_order_book(symbols[0], depth)
+                    }
+                else:
+                    raw_orderbooks = exchange.fetch_order_books(symbols, depth)
+        except Exception as e:
+            print(f"Error fetching order book: {e}")
+            return []
+
+        # Fallback for exchanges that don't timestamp their order books
+        received_at = int(time.time() * 1000)
+        orderbooks = []
+        for symbol in symbols:
+            orderbook = raw_orderbooks.get(symbol)
+            if not orderbook:
+                continue
+            # ccxt's unified order books already hold floats, only trim any
+            # exchange-specific extra fields so levels are [price, amount]
+            bids = [level[:2] for level in orderbook["bids"]]
+            asks = [level[:2] for level in orderbook["asks"]]
+            timestamp = orderbook.get("timestamp") or received_at
+            orderbooks.append(
+                [symbol, exchange_id, timestamp, {"bids": bids, "asks": asks}]
+            )
         return orderbooks
 
     def get_reversed_symbols(self) -> List[str]:
@@ -144,44 +297,50 @@ class PriceData:
                 raise ValueError("Invalid action. Use 'buy' or 'sell'.")
 
     def get_all_routes(self) -> List[Tuple[str]]:
-        unique_currencies = set()
+        return list(self.iter_all_routes())
+
+    def iter_all_routes(self) -> Iterator[Tuple[str]]:
+        """
+        Yields every route that starts at a currency, visits between 2 and
+        len(currencies) - 1 distinct currencies and trades back to the start.
+
+        Routes are built by a depth-first search that only extends a path along
+        traded pairs, so no candidate permutations are generated and rejected.
+        """
+        neighbors = defaultdict(set)
         for symbol in self.symbols:
             base, quote = symbol.split("/")
-            unique_currencies.add(base)
-            unique_currencies.add(quote)
+            neighbors[base].add(quote)
+            neighbors[quote].add(base)
+        max_path_length = len(neighbors) - 1
 
-        valid_routes = []
+        for start_currency in neighbors:
+            stack = [(start_currency,)]
+            while stack:
+                path = stack.pop()
+                end_currency = path[-1]
 
-        for start_currency in unique_currencies:
-            for end_currency in unique_currencies:
-                if start_currency == end_currency:
-                    continue
+                if len(path) >= 2 and start_currency in neighbors[end_currency]:
+                    yield tuple(
+                        f"{path[i]}/{path[i + 1]}" for i in range(len(path) - 1)
+                    ) + (f"{end_currency}/{start_currency}",)
 
-                for path_length in range(2, len(unique_currencies)):
-                    for path in permutations(unique_currencies, path_length):
-                        if path[0] == start_currency and path[-1] == end_currency:
-                            route_symbols = [
-                                f"{path[i]}/{path[i + 1]}" for i in range(len(path) - 1)
-                            ]
-                            route_symbols.append(f"{end_currency}/{start_currency}")
-                            if all(
-                                [
-                                    symbol in self.symbols
-                                    or f"{symbol.split('/')[1]}/{symbol.split('/')[0]}"
-                                    in self.symbols
-                                    for symbol in route_symbols
-                                ]
-                            ):
-                                valid_routes.append(tuple(route_symbols))
-
-        return valid_routes
+                if len(path) < max_path_length:
+                    for currency in neighbors[end_currency]:
+                        if currency not in path:
+                            stack.append(path + (currency,))
 
     def is_reversed_pair(self, symbol: str, exchange_id: str) -> bool:
-        return (
-            symbol not in self.exchanges[exchange_id].symbols
-            and f"{symbol.split('/')[1]}/{symbol.split('/')[0]}"
-            in self.exchanges[exchange_id].symbols
-        )
+        # Checked against the frozenset of listed symbols rather than the ccxt
+        # symbols list, and memoized since routes repeat the same pairs
+        key = (symbol, exchange_id)
+        if key not in self._reversed_pairs:
+            base, quote = symbol.split("/")
+            supported = self._supported[exchange_id]
+            self._reversed_pairs[key] = (
+                symbol not in supported and f"{quote}/{base}" in supported
+            )
+        return self._reversed_pairs[key]
 
 
 if __name__ == "__main__":
@@ -3,8 +3,7 @@ import itertools
 tokens = ["BTC", "ETH", "LTC", "USDC", "DAI", "USDT"]
 
 
-symbols = list(itertools.permutations(tokens, 2))
-symbols = ["/".join(symbol) for symbol in symbols]
+symbols = tuple(f"{base}/{quote}" for base, quote in itertools.permutations(tokens, 2))
 
 
 if __name__ == "__main__":
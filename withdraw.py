@@ -1,3 +1,4 @@
+import argparse
 import ccxt
 import os
 
@@ -7,9 +8,19 @@ api_pw = os.environ.get(f"KUCOIN_API_PASSWORD")
 
 kucoin = ccxt.kucoin({"apiKey": api_key, "secret": secret_key, "password": api_pw})
 
-kucoin.withdraw(
-    code="MATIC",
-    amount=10.0,
-    address="0xb14fFDB81E804D2792B6043B90aE5Ac973EcD53D",
-    params={"network": "MATIC"},
-)
+
+if __name__ == "__main__":
+    # Only withdraw when run as a script, importing this module must never move funds
+    parser = argparse.ArgumentParser(description="Withdraw funds from Kucoin.")
+    parser.add_argument("code", help="currency code to withdraw, e.g. MATIC")
+    parser.add_argument("amount", type=float, help="amount to withdraw")
+    parser.add_argument("address", help="destination address")
+    parser.add_argument("--network", help="network to withdraw on, e.g. MATIC")
+    args = parser.parse_args()
+
+    kucoin.withdraw(
+        code=args.code,
+        amount=args.amount,
+        address=args.address,
+        params={"network": args.network} if args.network else {},
+    )